@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import os
+import struct
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+# Sample entry formats that carry MPEG-1/2 Layer III audio.
+_MP3_FORMATS = {b".mp3", b"ms\x00U"}
+# MPEG-4 objectTypeIndication values for MPEG-1 / MPEG-2 audio (mp3 inside 'mp4a').
+_MP3_OBJECT_TYPES = {0x6B, 0x69}
+# Tags ffmpeg writes itself; their presence alone does not need ffmpeg to carry metadata over.
+_IGNORED_TAGS = {b"\xa9too"}
+
+_READ_SIZE = 1 << 20
+
+# Layer III bitrates (kbit/s) by bitrate index, for MPEG-1 and for MPEG-2/2.5.
+_L3_BITRATES = {
+    3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Sample rates by sample rate index, keyed by the header's version bits (3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5).
+_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    0: (11025, 12000, 8000),
+}
+
+
+def _boxes(data: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[tuple[bytes, int, int]]:
+    """
+    Yields (type, payload_start, payload_end) for the boxes in data[start:end].
+    """
+    end = len(data) if end is None else end
+    pos = start
+    while pos + 8 <= end:
+        size, kind = struct.unpack_from(">I4s", data, pos)
+        header = 8
+        if size == 1:
+            (size,) = struct.unpack_from(">Q", data, pos + 8)
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header or pos + size > end:
+            raise ValueError(f"Malformed box {kind!r} at {pos}")
+        yield kind, pos + header, pos + size
+        pos += size
+
+
+def _child(data: bytes, start: int, end: int, kind: bytes) -> Optional[tuple[int, int]]:
+    for k, s, e in _boxes(data, start, end):
+        if k == kind:
+            return s, e
+    return None
+
+
+def _path(data: bytes, start: int, end: int, *kinds: bytes) -> Optional[tuple[int, int]]:
+    span: Optional[tuple[int, int]] = (start, end)
+    for kind in kinds:
+        if span is None:
+            return None
+        span = _child(data, span[0], span[1], kind)
+    return span
+
+
+def _read_moov(f: BinaryIO) -> Optional[bytes]:
+    """
+    Scans the top-level boxes and returns the moov payload, without reading mdat.
+    """
+    f.seek(0, os.SEEK_END)
+    file_size = f.tell()
+    pos = 0
+    while pos + 8 <= file_size:
+        f.seek(pos)
+        head = f.read(16)
+        size, kind = struct.unpack_from(">I4s", head)
+        header = 8
+        if size == 1:
+            (size,) = struct.unpack_from(">Q", head, 8)
+            header = 16
+        elif size == 0:
+            size = file_size - pos
+        if size < header:
+            raise ValueError(f"Malformed box {kind!r} at {pos}")
+        if kind == b"moov":
+            f.seek(pos + header)
+            return f.read(size - header)
+        pos += size
+    return None
+
+
+def _ilst(data: bytes, meta: tuple[int, int]) -> Optional[tuple[int, int]]:
+    # MP4 'meta' is a full box (4 bytes version/flags before its children); QuickTime's is not.
+    for offset in (4, 0):
+        try:
+            found = _child(data, meta[0] + offset, meta[1], b"ilst")
+        except (ValueError, struct.error):
+            continue
+        if found is not None:
+            return found
+    return None
+
+
+def _has_tags(moov: bytes) -> bool:
+    """
+    True if the file carries user metadata (iTunes ilst items or QuickTime
+    udta text atoms) that ffmpeg would map to ID3 tags.
+    """
+    for meta in (_path(moov, 0, len(moov), b"udta", b"meta"), _path(moov, 0, len(moov), b"meta")):
+        ilst = _ilst(moov, meta) if meta is not None else None
+        if ilst is not None and any(k not in _IGNORED_TAGS for k, _, _ in _boxes(moov, *ilst)):
+            return True
+
+    udta = _path(moov, 0, len(moov), b"udta")
+    if udta is not None:
+        for kind, _, _ in _boxes(moov, *udta):
+            if kind.startswith(b"\xa9") and kind not in _IGNORED_TAGS:
+                return True
+    return False
+
+
+def _is_mp3_entry(data: bytes, kind: bytes, start: int, end: int) -> bool:
+    if kind in _MP3_FORMATS:
+        return True
+    if kind != b"mp4a":
+        return False
+
+    # AudioSampleEntry: 28 bytes of fixed fields; QuickTime sound description v1/v2 add 16/36.
+    (version,) = struct.unpack_from(">H", data, start + 8)
+    children = start + 28 + {0: 0, 1: 16, 2: 36}.get(version, 0)
+    esds = _child(data, children, end, b"esds")
+    if esds is None:
+        wave = _child(data, children, end, b"wave")
+        esds = _child(data, wave[0], wave[1], b"esds") if wave else None
+    if esds is None:
+        return False
+    return _esds_object_type(data, esds[0] + 4, esds[1]) in _MP3_OBJECT_TYPES
+
+
+def _esds_object_type(data: bytes, pos: int, end: int) -> Optional[int]:
+    def descriptor(pos: int) -> tuple[int, int]:
+        # Returns (tag, payload start); the size field is 1-4 bytes with a continuation bit.
+        tag = data[pos]
+        pos += 1
+        for _ in range(4):
+            pos += 1
+            if not data[pos - 1] & 0x80:
+                break
+        return tag, pos
+
+    tag, pos = descriptor(pos)
+    if tag != 0x03:
+        return None
+    flags = data[pos + 2]
+    pos += 3
+    if flags & 0x80:
+        pos += 2
+    if flags & 0x40:
+        pos += 1 + data[pos]
+    if flags & 0x20:
+        pos += 2
+    tag, pos = descriptor(pos)
+    if tag != 0x04 or pos >= end:
+        return None
+    return data[pos]
+
+
+def _plain_edit_list(data: bytes, trak: tuple[int, int]) -> bool:
+    """
+    True if the track has no edit list, or a single edit starting at media time 0.
+    """
+    elst = _path(data, trak[0], trak[1], b"edts", b"elst")
+    if elst is None:
+        return True
+    version = data[elst[0]]
+    (count,) = struct.unpack_from(">I", data, elst[0] + 4)
+    if count != 1:
+        return False
+    fmt = ">Qq" if version == 1 else ">Ii"
+    _, media_time = struct.unpack_from(fmt, data, elst[0] + 8)
+    return media_time == 0
+
+
+def _frame_length(header: bytes) -> Optional[int]:
+    """
+    Returns the unpadded length of the MPEG Layer III frame starting with
+    header, or None if it is not one (or uses free-format bitrate).
+    """
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = (header[1] >> 3) & 3
+    if version not in _SAMPLE_RATES or (header[1] >> 1) & 3 != 1:
+        return None
+    bitrate_index, rate_index = header[2] >> 4, (header[2] >> 2) & 3
+    if bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    bitrate = _L3_BITRATES[3 if version == 3 else 2][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    return (144 if version == 3 else 72) * bitrate // sample_rate
+
+
+def _sample_runs(moov: bytes, file_size: int) -> Optional[tuple[list[tuple[int, int]], set[int]]]:
+    """
+    Returns (offset, length) byte runs covering the samples of the first audio
+    track, in order, plus the distinct sample sizes, or None if that track is
+    not plain MP3 (or its sample table cannot fit in a file of file_size bytes).
+    """
+    if _child(moov, 0, len(moov), b"mvex") is not None:
+        return None  # fragmented MP4: samples live in moof/mdat pairs
+
+    for kind, ts, te in _boxes(moov):
+        if kind != b"trak":
+            continue
+        hdlr = _path(moov, ts, te, b"mdia", b"hdlr")
+        if hdlr is None or moov[hdlr[0] + 8:hdlr[0] + 12] != b"soun":
+            continue
+        # ffmpeg's 0:a:0 is the first audio track; only that one is a candidate.
+        break
+    else:
+        return None
+
+    if not _plain_edit_list(moov, (ts, te)):
+        return None
+    stbl = _path(moov, ts, te, b"mdia", b"minf", b"stbl")
+    if stbl is None:
+        return None
+
+    stsd = _child(moov, stbl[0], stbl[1], b"stsd")
+    if stsd is None or struct.unpack_from(">I", moov, stsd[0] + 4)[0] != 1:
+        return None
+    entry = next(_boxes(moov, stsd[0] + 8, stsd[1]), None)
+    if entry is None or not _is_mp3_entry(moov, *entry):
+        return None
+
+    stsz = _child(moov, stbl[0], stbl[1], b"stsz")
+    stsc = _child(moov, stbl[0], stbl[1], b"stsc")
+    stco = _child(moov, stbl[0], stbl[1], b"stco")
+    co64 = _child(moov, stbl[0], stbl[1], b"co64")
+    if stsz is None or stsc is None or (stco is None and co64 is None):
+        return None
+
+    sample_size, sample_count = struct.unpack_from(">II", moov, stsz[0] + 4)
+    if sample_size:
+        # Guard the list below against a corrupt count; real samples must fit in the file.
+        if sample_size * sample_count > file_size:
+            return None
+        sizes = [sample_size] * sample_count
+    else:
+        sizes = list(struct.unpack_from(f">{sample_count}I", moov, stsz[0] + 12))
+
+    if stco is not None:
+        (n,) = struct.unpack_from(">I", moov, stco[0] + 4)
+        offsets = struct.unpack_from(f">{n}I", moov, stco[0] + 8)
+    else:
+        (n,) = struct.unpack_from(">I", moov, co64[0] + 4)
+        offsets = struct.unpack_from(f">{n}Q", moov, co64[0] + 8)
+
+    (n,) = struct.unpack_from(">I", moov, stsc[0] + 4)
+    stsc_entries = [struct.unpack_from(">III", moov, stsc[0] + 8 + 12 * i) for i in range(n)]
+
+    runs: list[tuple[int, int]] = []
+    sample = 0
+    for i, (first_chunk, per_chunk, _) in enumerate(stsc_entries):
+        last_chunk = stsc_entries[i + 1][0] - 1 if i + 1 < len(stsc_entries) else len(offsets)
+        for chunk in range(first_chunk, last_chunk + 1):
+            offset = offsets[chunk - 1]
+            length = sum(sizes[sample:sample + per_chunk])
+            sample += per_chunk
+            if runs and runs[-1][0] + runs[-1][1] == offset:
+                runs[-1] = (runs[-1][0], runs[-1][1] + length)
+            else:
+                runs.append((offset, length))
+    if sample != sample_count:
+        raise ValueError("Sample table does not match sample count")
+    return runs, set(sizes)
+
+
+def extract_mp3_stream(src: Path, dst: Path) -> bool:
+    """
+    Copies the MP3 frames of src's first audio track to dst without ffmpeg.
+    Only handles plain, untagged, constant-bitrate MP3-in-MP4; returns False
+    whenever ffmpeg should do the job instead. dst is overwritten and may be
+    left incomplete, so callers pass a scratch path and move it into place.
+    """
+    try:
+        with open(src, "rb") as f:
+            moov = _read_moov(f)
+            table = _sample_runs(moov, os.fstat(f.fileno()).st_size) if moov is not None else None
+            if table is None or _has_tags(moov):
+                return False
+            runs, sizes = table
+
+            # ffmpeg writes a Xing/Info frame with the frame count; a bare frame copy has
+            # none, so players would estimate a VBR stream's duration from its first frame.
+            # Only take streams whose frames all share one bitrate (sizes differ by padding).
+            f.seek(runs[0][0])
+            frame = _frame_length(f.read(4))
+            if frame is None or not sizes <= {frame, frame + 1}:
+                return False
+
+            with open(dst, "wb") as out:
+                for offset, length in runs:
+                    f.seek(offset)
+                    while length > 0:
+                        buf = f.read(min(length, _READ_SIZE))
+                        if not buf:
+                            raise ValueError("Sample data past end of file")
+                        out.write(buf)
+                        length -= len(buf)
+    except (OSError, ValueError, IndexError, struct.error):
+        return False
+    return True
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS probe (
+    path TEXT,
+    mtime INTEGER,
+    size INTEGER,
+    info BLOB,
+    PRIMARY KEY (path, mtime, size)
+)
+"""
+
+
+def cache_path() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(base) / "mp4-to-mp3" / "probe.sqlite"
+
+
+_local = threading.local()
+_read_only = False
+
+
+def set_read_only() -> None:
+    """
+    Makes the cache lookup-only for this process: get() reads an existing
+    cache file but never creates one, and put() does nothing.
+    """
+    global _read_only
+    _read_only = True
+
+
+def _connection() -> sqlite3.Connection:
+    """
+    Returns this thread's connection, opening it on first use. Long-lived pool
+    workers reuse it for every file instead of reconnecting per probe.
+    """
+    # A connection inherited through fork() must not be used by the child.
+    if getattr(_local, "pid", None) != os.getpid():
+        db = cache_path()
+        if _read_only:
+            # Fails (as a miss) if there is no cache file yet, instead of creating it.
+            conn = sqlite3.connect(f"{db.resolve().as_uri()}?mode=ro", uri=True, timeout=5)
+        else:
+            db.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(db), timeout=5)
+            conn.execute(_SCHEMA)
+        _local.conn, _local.pid = conn, os.getpid()
+    return _local.conn
+
+
+def _key(path: Path) -> tuple[str, int, int]:
+    st = os.stat(path)
+    return os.path.realpath(path), st.st_mtime_ns, st.st_size
+
+
+def get(path: Path) -> Optional[dict[str, Any]]:
+    """
+    Returns the stored probe fields for path, or None on a miss.
+    A changed mtime or size is a miss, so stale entries are never returned.
+    """
+    try:
+        key = _key(path)
+        with _connection() as conn:
+            row = conn.execute(
+                "SELECT info FROM probe WHERE path = ? AND mtime = ? AND size = ?", key
+            ).fetchone()
+    except (OSError, sqlite3.Error):
+        return None
+    if row is None:
+        return None
+    try:
+        return json.loads(row[0])
+    except ValueError:
+        return None
+
+
+def put(path: Path, info: dict[str, Any]) -> None:
+    """
+    Stores probe fields for path. Failures are ignored; the cache is best effort.
+    """
+    if _read_only:
+        return
+    try:
+        key = _key(path)
+        with _connection() as conn:
+            # Drop rows for older versions of the file so the table does not grow unbounded.
+            conn.execute("DELETE FROM probe WHERE path = ?", (key[0],))
+            conn.execute("INSERT INTO probe VALUES (?, ?, ?, ?)", (*key, json.dumps(info)))
+    except (OSError, sqlite3.Error):
+        pass
@@ -1,16 +1,35 @@
 #!/usr/bin/env python3
 from __future__ import annotations
-from . import __version__
+from . import __version__, _mp4, _probe_cache
 
 import argparse
+import functools
+import itertools
 import json
+import os
+import re
+import shlex
 import shutil
+import stat
 import subprocess
-from dataclasses import dataclass
+import sys
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, replace
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Callable, Iterable, Iterator, Optional, TypeVar
 
-VIDEO_EXTS = {".mp4", ".m4v", ".mov"}
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+VIDEO_EXTS = frozenset({".mp4", ".m4v", ".mov"})
+# Same set without the dot, for matching the tail of str.rpartition(".") in the walker.
+_EXTS_NODOT = frozenset(ext[1:] for ext in VIDEO_EXTS)
 
 
 @dataclass
@@ -19,16 +38,51 @@ class ProbeInfo:
     bit_rate: Optional[int] = None
     channels: Optional[int] = None
     sample_rate: Optional[int] = None
+    has_audio: bool = False
+
+
+_PROBE_CACHE: dict[Path, ProbeInfo] = {}
+_MKDIR_SEEN: set[Path] = set()
+
 
+@dataclass(frozen=True)
+class ConvertTask:
+    input_path: Path
+    output_path: Path
+    mode: str
+    bitrate: str
+    vbr_q: int
+    overwrite: bool
+    threads: int = 0
+    strict_detect: bool = False
+    fast_probe: bool = True
+    # Set by _claim_outputs when an earlier task already writes output_path.
+    duplicate: bool = False
 
-def which_or_exit(cmd: str, install_hint: str) -> None:
-    if shutil.which(cmd) is None:
+
+# Lets subprocess use posix_spawn (vfork) instead of fork+exec, so spawn cost does
+# not grow with parent RSS. CPython only takes that path for an absolute executable
+# (see _tool), no preexec_fn/cwd/pass_fds, and close_fds=False before 3.13.
+# Keeping fds open is safe: Python creates them non-inheritable (PEP 446).
+_SPAWN_KWARGS = {"close_fds": False}
+
+_INSTALL_HINT = "Install via Homebrew: brew install ffmpeg"
+
+
+@functools.lru_cache(maxsize=None)
+def _tool(cmd: str, install_hint: str = _INSTALL_HINT) -> str:
+    """
+    Resolves cmd on $PATH once per process and returns its absolute path.
+    """
+    path = shutil.which(cmd)
+    if path is None:
         raise SystemExit(f"{cmd} not found. {install_hint}")
+    return os.path.abspath(path)
 
 
 def ensure_tools() -> None:
-    which_or_exit("ffmpeg", "Install via Homebrew: brew install ffmpeg")
-    which_or_exit("ffprobe", "Install via Homebrew: brew install ffmpeg")
+    _tool("ffmpeg")
+    _tool("ffprobe")
 
 
 def ask_choice(prompt: str, choices: dict[str, str], default_key: str) -> str:
@@ -56,54 +110,105 @@ def ask_yes_no(prompt: str, default: bool) -> bool:
         print("Please enter y/n (or press Enter for default).")
 
 
-def iter_inputs(in_path: Path, recursive: bool) -> Iterable[Path]:
-    if in_path.is_dir():
-        if recursive:
-            yield from (p for p in in_path.rglob("*") if p.is_file() and p.suffix.lower() in VIDEO_EXTS)
-        else:
-            yield from (p for p in in_path.iterdir() if p.is_file() and p.suffix.lower() in VIDEO_EXTS)
-    else:
-        yield in_path
+def _is_video_name(name: str) -> bool:
+    # Same rule as Path.suffix: a leading dot alone (".mp4") is not an extension.
+    stem, _, ext = name.rpartition(".")
+    return bool(stem) and ext.lower() in _EXTS_NODOT
+
+
+def iter_inputs(in_path: Path, recursive: bool, in_stat: Optional[os.stat_result] = None) -> Iterable[Path]:
+    """
+    Yields video files below in_path (or in_path itself if it is a video file).
+    Walks with os.scandir and filters on the entry name, so non-matching
+    entries never become Path objects and need no extra stat call.
+    Pass in_stat if the caller has already stat'ed in_path. Yielded paths are
+    absolute whenever in_path is.
+    """
+    if in_stat is None:
+        in_stat = in_path.stat()
+    if not stat.S_ISDIR(in_stat.st_mode):
+        if stat.S_ISREG(in_stat.st_mode) and _is_video_name(in_path.name):
+            yield in_path
+        return
+
+    stack = [str(in_path)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            # Unreadable (or vanished) directory: skip it, as rglob did.
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        stack.append(entry.path)
+                elif _is_video_name(entry.name) and entry.is_file():
+                    yield Path(entry.path)
 
 
 def ffprobe_audio_info(path: Path) -> ProbeInfo:
     """
-    Tries to read the first audio stream info using ffprobe JSON output.
+    Reads all audio streams in one ffprobe call and returns info for the first one.
+    Results are cached per path in memory and on disk (keyed by mtime and size).
     Returns ProbeInfo with None fields if something fails.
     """
-    ensure_tools()
+    cached = _PROBE_CACHE.get(path)
+    if cached is not None:
+        return cached
+
+    stored = _probe_cache.get(path)
+    if stored is not None:
+        try:
+            info = ProbeInfo(**stored)
+        except TypeError:
+            info = None
+        if info is not None:
+            _PROBE_CACHE[path] = info
+            return info
+
     cmd = [
-        "ffprobe",
+        _tool("ffprobe"),
         "-v", "error",
-        "-select_streams", "a:0",
-        "-show_entries", "stream=codec_name,bit_rate,channels,sample_rate",
+        "-select_streams", "a",
+        "-show_entries", "stream=index,codec_name,bit_rate,channels,sample_rate",
         "-of", "json",
         str(path),
     ]
     try:
-        out = subprocess.check_output(cmd, text=True)
-        data = json.loads(out)
+        out = subprocess.check_output(cmd, **_SPAWN_KWARGS)
+        data = _json.loads(out)
         streams = data.get("streams") or []
         if not streams:
-            return ProbeInfo()
-        s = streams[0]
-        return ProbeInfo(
-            codec_name=s.get("codec_name"),
-            bit_rate=int(s["bit_rate"]) if s.get("bit_rate") else None,
-            channels=int(s["channels"]) if s.get("channels") else None,
-            sample_rate=int(s["sample_rate"]) if s.get("sample_rate") else None,
-        )
+            info = ProbeInfo()
+        else:
+            s = streams[0]
+            info = ProbeInfo(
+                codec_name=s.get("codec_name"),
+                bit_rate=int(s["bit_rate"]) if s.get("bit_rate") else None,
+                channels=int(s["channels"]) if s.get("channels") else None,
+                sample_rate=int(s["sample_rate"]) if s.get("sample_rate") else None,
+                has_audio=True,
+            )
+        _probe_cache.put(path, asdict(info))
     except Exception:
-        return ProbeInfo()
+        info = ProbeInfo()
 
+    _PROBE_CACHE[path] = info
+    return info
 
-def autodetect_mode(path: Path) -> str:
+
+def autodetect_mode(path: Path, strict: bool = False) -> str:
     """
     Auto-detect strategy:
+    - MP4/M4V/MOV without strict: 'vbr' without probing (MP3 audio in these containers is rare).
     - If codec is mp3: prefer 'copy' (no re-encode).
     - Otherwise: prefer 'vbr' (good default for typical AAC sources).
     - If detection fails: 'vbr'.
     """
+    if not strict and path.suffix.lower() in VIDEO_EXTS:
+        return "vbr"
+
     info = ffprobe_audio_info(path)
     codec = (info.codec_name or "").lower()
 
@@ -114,38 +219,37 @@ def autodetect_mode(path: Path) -> str:
     return "vbr"
 
 def has_audio_stream(path: Path) -> bool:
-    ensure_tools()
-    cmd = [
-        "ffprobe",
-        "-v", "error",
-        "-select_streams", "a",
-        "-show_entries", "stream=index",
-        "-of", "json",
-        str(path),
-    ]
-    try:
-        out = subprocess.check_output(cmd, text=True)
-        data = json.loads(out)
-        return bool(data.get("streams"))
-    except Exception:
-        return False
+    return ffprobe_audio_info(path).has_audio
+
+# Audio extraction only needs the stream layout from the container header, not
+# ffmpeg's default stream sniffing. (-analyzeduration 0 would mean "default".)
+_FAST_PROBE_OPTS = ["-probesize", "32k", "-fflags", "+fastseek"]
 
-def run_ffmpeg(
+
+def build_ffmpeg_cmd(
     input_path: Path,
     output_path: Path,
     overwrite: bool,
     mode: str,
     bitrate: str,
     vbr_q: int,
-) -> None:
-    ensure_tools()
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    threads: int = 0,
+    fast_probe: bool = False,
+    ffmpeg: Optional[str] = None,
+) -> list[str]:
+    # Stream copy does no decoding or encoding, so thread options only matter when transcoding.
+    thread_opts = [] if mode == "copy" else ["-threads", str(threads)]
+    probe_opts = _FAST_PROBE_OPTS if fast_probe else []
 
     cmd = [
-        "ffmpeg",
+        ffmpeg or _tool("ffmpeg"),
         "-hide_banner",
+        "-loglevel", "error",
         "-nostats",
+        *thread_opts,
+        *probe_opts,
         "-i", str(input_path),
+        *thread_opts,
         "-vn",
         "-map", "0:a:0",
         "-map_metadata", "0",
@@ -164,10 +268,294 @@ def run_ffmpeg(
 
     cmd.append("-y" if overwrite else "-n")
     cmd.append(str(output_path))
+    return cmd
+
+
+def _start_ffmpeg(cmd: list[str]) -> subprocess.Popen:
+    # No terminal I/O from ffmpeg: parallel workers would otherwise contend for the tty.
+    return subprocess.Popen(
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        **_SPAWN_KWARGS,
+    )
 
-    proc = subprocess.run(cmd)
+
+def _wait_ffmpeg(proc: subprocess.Popen) -> Optional[str]:
+    """
+    Waits for ffmpeg to exit. Returns its stderr if it failed, None on success.
+    """
+    _, stderr = proc.communicate()
     if proc.returncode != 0:
-        raise SystemExit(f"Conversion failed: {input_path}")
+        return stderr.decode(errors="replace").strip()
+    return None
+
+
+def _is_no_audio(err: str) -> bool:
+    # ffmpeg refuses "-map 0:a:0" when the input has no audio stream.
+    return "matches no streams" in err
+
+
+def _partial_path(output_path: Path) -> Path:
+    """
+    Where ffmpeg writes before the result is moved into place. Unique per
+    process, so a failed or killed run only ever leaves (and removes) its own file.
+    """
+    return output_path.with_name(f".{output_path.stem}.{os.getpid()}.partial.mp3")
+
+
+def _ensure_dir(path: Path) -> None:
+    # Many outputs share a directory; skip the mkdir syscall after the first one.
+    if path not in _MKDIR_SEEN:
+        path.mkdir(parents=True, exist_ok=True)
+        _MKDIR_SEEN.add(path)
+
+
+_NO_AUDIO = "{header}\n  No audio stream found, skipping."
+
+
+def _move_into_place(task: ConvertTask, partial: Path) -> str:
+    """
+    Moves a finished partial file to the output path and returns its status
+    line. Without --overwrite, an output that appeared meanwhile is kept.
+    """
+    if not task.overwrite and task.output_path.exists():
+        return f"  Skip (exists): {task.output_path}"
+    os.replace(partial, task.output_path)
+    return "OK"
+
+
+def _plan(task: ConvertTask) -> tuple[str, Optional[str]]:
+    """
+    Decides what to do with one file without touching the output side.
+    Returns the status header and the encoding mode, or the final status
+    lines and None if the file is skipped.
+    """
+    if task.duplicate or (task.output_path.exists() and not task.overwrite):
+        return f"Skip (exists): {task.output_path}", None
+
+    file_mode = task.mode
+    if file_mode == "auto":
+        file_mode = autodetect_mode(task.input_path, strict=task.strict_detect)
+
+    header = f"Converting: {task.input_path} -> {task.output_path} [{file_mode.upper()}]"
+    # Without strict detection, ffmpeg itself reports a missing audio stream; no probe needed.
+    if task.strict_detect and not has_audio_stream(task.input_path):
+        return _NO_AUDIO.format(header=header), None
+    return header, file_mode
+
+
+def _ffmpeg_attempts(task: ConvertTask, file_mode: str) -> list[list[str]]:
+    """
+    Returns the ffmpeg commands to try in order for one file. They write to
+    _partial_path(); _finish moves the result into place.
+    """
+    build = functools.partial(
+        build_ffmpeg_cmd,
+        input_path=task.input_path,
+        output_path=_partial_path(task.output_path),
+        overwrite=True,
+        mode=file_mode,
+        bitrate=task.bitrate,
+        vbr_q=task.vbr_q,
+        threads=task.threads,
+    )
+    if task.fast_probe:
+        return [build(fast_probe=True), build(fast_probe=False)]
+    return [build()]
+
+
+def _prepare(task: ConvertTask) -> tuple[str, list[list[str]]]:
+    """
+    Decides what to do with one file. Returns the status header and the ffmpeg
+    commands to try in order, or the final status lines and [] if no ffmpeg run
+    is needed (skipped, or stream-copied in-process).
+    """
+    header, file_mode = _plan(task)
+    if file_mode is None:
+        return header, []
+
+    _ensure_dir(task.output_path.parent)
+    # Plain MP3-in-MP4 is copied in-process; anything it cannot handle goes through ffmpeg.
+    if file_mode == "copy":
+        partial = _partial_path(task.output_path)
+        try:
+            if _mp4.extract_mp3_stream(task.input_path, partial):
+                return f"{header}\n{_move_into_place(task, partial)}", []
+        finally:
+            partial.unlink(missing_ok=True)
+    return header, _ffmpeg_attempts(task, file_mode)
+
+
+def _dry_run(tasks: Iterable[ConvertTask], emit: str) -> None:
+    """
+    Prints the planned ffmpeg command for each file instead of running it:
+    one JSON object per line, or one shell command line. Skipped files are
+    reported on stderr so stdout stays machine-readable.
+    """
+    for task in tasks:
+        status, file_mode = _plan(task)
+        if file_mode is None:
+            print(status, file=sys.stderr)
+            continue
+
+        # The command may run on another machine and has no retry around it, so
+        # leave out the fast-probe options and let PATH resolve ffmpeg there.
+        cmd = build_ffmpeg_cmd(
+            input_path=task.input_path,
+            output_path=task.output_path,
+            overwrite=task.overwrite,
+            mode=file_mode,
+            bitrate=task.bitrate,
+            vbr_q=task.vbr_q,
+            threads=task.threads,
+            ffmpeg="ffmpeg",
+        )
+        if emit == "json":
+            print(json.dumps({
+                "in": str(task.input_path),
+                "out": str(task.output_path),
+                "mode": file_mode,
+                "cmd": cmd,
+            }))
+        else:
+            line = shlex.join(cmd)
+            if not task.output_path.parent.is_dir():
+                line = f"{shlex.join(['mkdir', '-p', str(task.output_path.parent)])} && {line}"
+            print(line)
+
+
+def _finish(
+    header: str,
+    task: ConvertTask,
+    attempts: list[list[str]],
+    proc: Optional[subprocess.Popen],
+) -> str:
+    """
+    Waits for the first attempt (already started as proc) and runs any
+    remaining attempts while it fails. On success the partial file is moved
+    to the output path. Returns the status lines.
+    """
+    if proc is None:
+        return header
+
+    lines = [header]
+    partial = _partial_path(task.output_path)
+    try:
+        err = _wait_ffmpeg(proc)
+        for cmd in attempts[1:]:
+            # A too-small probe surfaces as whatever fails next (the demuxer's own
+            # warning is hidden by -loglevel error), so any failure but a missing
+            # audio stream is worth a full-probe run into the same partial file.
+            if err is None or _is_no_audio(err):
+                break
+            lines.append("  Fast probe failed, retrying with full stream analysis.")
+            err = _wait_ffmpeg(_start_ffmpeg(cmd))
+
+        if err is None:
+            lines.append(_move_into_place(task, partial))
+        elif _is_no_audio(err):
+            return _NO_AUDIO.format(header=header)
+        else:
+            raise SystemExit(f"Conversion failed: {task.input_path}\n{err}")
+    finally:
+        partial.unlink(missing_ok=True)
+    return "\n".join(lines)
+
+
+def _convert_one(task: ConvertTask) -> str:
+    """
+    Converts a single file and returns the status lines to print.
+    Runs inside pool workers, so it must never prompt or touch stdin.
+    """
+    header, attempts = _prepare(task)
+    proc = _start_ffmpeg(attempts[0]) if attempts else None
+    return _finish(header, task, attempts, proc)
+
+
+def _init_worker() -> None:
+    """
+    Warms per-process state once when a pool worker starts, so every file it
+    converts afterwards reuses the resolved tool paths.
+    """
+    ensure_tools()
+
+
+def _convert_pipelined(tasks: Iterable[ConvertTask], depth: int) -> Iterator[str]:
+    """
+    Converts tasks in order, starting the next ffmpeg before the previous one
+    has exited so that at most `depth` processes are in flight. Yields status
+    lines in input order.
+    """
+    inflight: deque[tuple[str, ConvertTask, list[list[str]], Optional[subprocess.Popen]]] = deque()
+    running = 0
+    try:
+        for task in tasks:
+            header, attempts = _prepare(task)
+            if not attempts:
+                inflight.append((header, task, attempts, None))
+                continue
+            while running >= depth:
+                item = inflight.popleft()
+                if item[3] is not None:
+                    running -= 1
+                yield _finish(*item)
+            inflight.append((header, task, attempts, _start_ffmpeg(attempts[0])))
+            running += 1
+        while inflight:
+            yield _finish(*inflight.popleft())
+    finally:
+        # Only reached with items left on failure: stop their ffmpeg runs and drop
+        # what they wrote, so a later run does not mistake it for a finished output.
+        for _, task, _, proc in inflight:
+            if proc is None:
+                continue
+            if proc.poll() is None:
+                proc.kill()
+            proc.communicate()
+            _partial_path(task.output_path).unlink(missing_ok=True)
+
+
+def _peek(items: Iterable[T]) -> Optional[Iterator[T]]:
+    """
+    Returns an iterator over items, or None if items is empty.
+    Only the first item is consumed to find out.
+    """
+    it = iter(items)
+    for first in it:
+        return itertools.chain([first], it)
+    return None
+
+
+def _claim_outputs(tasks: Iterable[ConvertTask]) -> Iterator[ConvertTask]:
+    """
+    Yields tasks in order, marking any task whose output path an earlier task
+    already claimed (e.g. a.mp4 next to a.mov, or the same name in two subfolders
+    with -o) as a duplicate, which _plan skips. Runs in the parent, so
+    concurrent jobs never write the same file.
+    """
+    claimed: set[Path] = set()
+    for task in tasks:
+        if task.output_path in claimed:
+            yield replace(task, duplicate=True)
+            continue
+        claimed.add(task.output_path)
+        yield task
+
+
+def _map_bounded(ex: Executor, fn: Callable[[T], R], items: Iterable[T], limit: int) -> Iterator[R]:
+    """
+    Like ex.map(fn, items), but submits lazily with at most `limit` pending
+    futures, so work starts before items is exhausted and memory stays bounded.
+    """
+    pending: deque = deque()
+    for item in items:
+        if len(pending) >= limit:
+            yield pending.popleft().result()
+        pending.append(ex.submit(fn, item))
+    while pending:
+        yield pending.popleft().result()
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -178,6 +566,7 @@ Examples:
   mp4-to-mp3 ~/Downloads/mp4s -o ~/Music/mp3 --mode vbr --vbr-q 2
   mp4-to-mp3 ~/Downloads/video.mp4 --mode cbr -b 192k
   mp4-to-mp3 ~/Downloads/video.mp4 --mode auto
+  mp4-to-mp3 ~/Downloads/mp4s --recursive --dry-run --emit shell | parallel
 """
     p = argparse.ArgumentParser(
         prog="mp4-to-mp3",
@@ -201,41 +590,129 @@ Examples:
         "--mode",
         choices=["auto", "cbr", "vbr", "copy"],
         default="auto",
-        help="Encoding mode. 'auto' detects source via ffprobe. 'copy' attempts stream copy if already MP3.",
+        help="Encoding mode. 'auto' uses VBR (or probes the source with --strict-detect). 'copy' attempts stream copy if already MP3.",
     )
     enc.add_argument("-b", "--bitrate", default="192k", help="CBR bitrate (e.g. 128k, 192k, 320k). Default: 192k.")
     enc.add_argument("--vbr-q", type=int, default=2, help="VBR quality 0..9 (0 best). Default: 2.")
+    enc.add_argument(
+        "--ffmpeg-threads",
+        type=int,
+        default=0,
+        help="Threads ffmpeg may use per file (0 = auto). Default: 0.",
+    )
+    enc.add_argument(
+        "--fast-probe",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Skip ffmpeg's stream analysis at startup; files that fail are retried without it. Default: on.",
+    )
+    enc.add_argument(
+        "--strict-detect",
+        action="store_true",
+        help="In auto mode, probe every file via ffprobe and stream-copy sources that already have MP3 audio.",
+    )
 
     behavior = p.add_argument_group("Behavior")
     behavior.add_argument("--recursive", action="store_true", help="Scan subfolders recursively (when input is a directory).")
     behavior.add_argument("--overwrite", action="store_true", help="Overwrite existing MP3 files.")
     behavior.add_argument("--no-prompt", action="store_true", help="Disable interactive prompts (use defaults/flags only).")
+    behavior.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of files to convert in parallel. Default: number of CPU cores.",
+    )
+    behavior.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Print the planned ffmpeg commands instead of running them (implies --no-prompt).",
+    )
+    behavior.add_argument(
+        "--emit",
+        choices=["json", "shell"],
+        help="Output format for --dry-run: one JSON object or one shell command per line. Default: json.",
+    )
+    behavior.add_argument(
+        "--pipeline-depth",
+        type=int,
+        default=2,
+        help="With a single job, start the next ffmpeg before the previous one exits, "
+        "keeping up to this many in flight. Default: 2.",
+    )
 
     return p
 
 
+def _check_out_dir(out_dir: Path) -> None:
+    """
+    Fails early if out_dir cannot be written to. A missing out_dir is created
+    later, so its nearest existing ancestor must be writable instead.
+    """
+    existing = out_dir
+    while not existing.exists() and existing.parent != existing:
+        existing = existing.parent
+    if not existing.is_dir():
+        raise SystemExit(f"Output path is not a directory: {existing}")
+    if not os.access(existing, os.W_OK | os.X_OK):
+        raise SystemExit(f"Output directory is not writable: {existing}")
+
+
 def main() -> None:
     p = build_parser()
     args = p.parse_args()
+    if args.dry_run:
+        # stdout carries the plan; prompts would corrupt it.
+        args.no_prompt = True
+        # Planning writes nothing, including the probe cache that --strict-detect consults.
+        _probe_cache.set_read_only()
+
+    # Validate everything up front so a bad flag fails once, before any walking or prompting.
+    # 'auto' may resolve to VBR or (interactively) CBR, so both settings are checked for it.
+    if args.mode in ("vbr", "auto") and not (0 <= args.vbr_q <= 9):
+        raise SystemExit("--vbr-q must be between 0 and 9.")
+
+    if not re.fullmatch(r"[1-9][0-9]*[kK]?", args.bitrate):
+        raise SystemExit("--bitrate must be like 192k.")
+
+    if args.ffmpeg_threads < 0:
+        raise SystemExit("--ffmpeg-threads must be 0 (auto) or greater.")
+
+    if args.jobs < 1:
+        raise SystemExit("--jobs must be at least 1.")
+
+    if args.pipeline_depth < 1:
+        raise SystemExit("--pipeline-depth must be at least 1.")
+
+    if args.emit is not None and not args.dry_run:
+        raise SystemExit("--emit only applies to --dry-run.")
 
     in_path = Path(args.input).expanduser().resolve()
     out_dir = Path(args.out).expanduser().resolve() if args.out else None
 
-    if not in_path.exists():
+    # The one stat of the input; everything below reuses it.
+    try:
+        in_stat = in_path.stat()
+    except OSError:
         raise SystemExit(f"Path not found: {in_path}")
+    in_is_dir = stat.S_ISDIR(in_stat.st_mode)
 
-    if args.mode == "vbr" and not (0 <= args.vbr_q <= 9):
-        raise SystemExit("--vbr-q must be between 0 and 9.")
+    if out_dir is not None and not args.dry_run:
+        _check_out_dir(out_dir)
+
+    if not args.dry_run:
+        ensure_tools()
+    elif args.strict_detect:
+        # Strict detection probes every file, even when only planning.
+        _tool("ffprobe")
 
     # Determine recursive behavior (interactive if directory and not set)
     recursive = args.recursive
-    if in_path.is_dir() and not args.recursive and not args.no_prompt:
+    if in_is_dir and not args.recursive and not args.no_prompt:
         recursive = ask_yes_no("Scan subfolders recursively?", default=True)
 
-    files = sorted(iter_inputs(in_path, recursive=recursive))
-    files = [f for f in files if f.is_file() and f.suffix.lower() in VIDEO_EXTS]
+    files = _peek(iter_inputs(in_path, recursive=recursive, in_stat=in_stat))
 
-    if not files:
+    if files is None:
         raise SystemExit(f"No MP4/M4V/MOV files found in: {in_path}")
 
     # Determine mode
@@ -247,38 +724,48 @@ def main() -> None:
         else:
             # Ask user whether to override auto-detect
             choice = ask_choice(
-                "Encoding mode? (auto detects via ffprobe)",
+                "Encoding mode? (auto uses VBR unless --strict-detect)",
                 choices={"a": "AUTO", "c": "CBR", "v": "VBR"},
                 default_key="a",
             )
             mode = {"a": "auto", "c": "cbr", "v": "vbr"}[choice]
 
-    for f in files:
-        target_dir = out_dir if out_dir else f.parent
-        out_file = target_dir / (f.stem + ".mp3")
-
-        if out_file.exists() and not args.overwrite:
-            print(f"Skip (exists): {out_file}")
-            continue
-
-        file_mode = mode
-        if file_mode == "auto":
-            file_mode = autodetect_mode(f)
-
-        print(f"Converting: {f} -> {out_file} [{file_mode.upper()}]")
-        if not has_audio_stream(f):
-            print(f"  No audio stream found, skipping.")
-            continue
-
-        run_ffmpeg(
+    tasks = _claim_outputs(
+        ConvertTask(
             input_path=f,
-            output_path=out_file,
-            overwrite=args.overwrite,
-            mode=file_mode,
+            output_path=(out_dir if out_dir else f.parent) / (f.stem + ".mp3"),
+            mode=mode,
             bitrate=args.bitrate,
             vbr_q=args.vbr_q,
+            overwrite=args.overwrite,
+            threads=args.ffmpeg_threads,
+            strict_detect=args.strict_detect,
+            fast_probe=args.fast_probe,
         )
-        print("OK")
+        for f in files
+    )
+
+    if args.dry_run:
+        _dry_run(tasks, emit=args.emit or "json")
+        return
+
+    # All prompts happen above; workers never read from stdin.
+    # Files are streamed from the walk, so a single input file is the only count known up front.
+    jobs = 1 if not in_is_dir else min(args.jobs, os.cpu_count() or 1)
+    if jobs == 1:
+        for result in _convert_pipelined(tasks, depth=args.pipeline_depth):
+            print(result)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as ex:
+        try:
+            for result in _map_bounded(ex, _convert_one, tasks, limit=2 * jobs):
+                print(result)
+        except BaseException:
+            # Stop at the first failure: drop queued files instead of converting them
+            # while the with-block waits for the pool to shut down.
+            ex.shutdown(wait=False, cancel_futures=True)
+            raise
 
 
 if __name__ == "__main__":